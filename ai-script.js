@@ -1,3 +1,6 @@
+// Flask API server; the pages themselves are opened directly or via a live server
+const API_BASE = 'http://localhost:5000';
+
 document.addEventListener('DOMContentLoaded', function() {
     // --- DOM Elements ---
     const notesInput = document.getElementById('notes-input');
@@ -16,6 +19,9 @@ document.addEventListener('DOMContentLoaded', function() {
         { question: "Who wrote 'Romeo and Juliet'?", answer: "William Shakespeare" },
     ];
 
+    // Cleared once the user generates or clears cards themselves
+    let showSavedFlashcards = true;
+
     // --- Event Listeners ---
     generateBtn.addEventListener('click', handleGenerateFlashcards);
     exportBtn.addEventListener('click', handleExport);
@@ -23,6 +29,8 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- Event Handlers ---
     async function handleGenerateFlashcards() {
+        // Saved cards that finish loading after this must not replace new ones
+        showSavedFlashcards = false;
         const notes = notesInput.value.trim();
         const language = languageSelect.value;
 
@@ -36,7 +44,7 @@ document.addEventListener('DOMContentLoaded', function() {
         flashcardsContainer.innerHTML = '';
 
         try {
-            const response = await fetch('http://localhost:5000/generate-flashcards', {
+            const response = await fetch(`${API_BASE}/generate-flashcards`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ notes: notes, language: language })
@@ -56,6 +64,9 @@ document.addEventListener('DOMContentLoaded', function() {
             data.flashcards.forEach(card => createFlashcard(card.question, card.answer));
             showNotification('Flashcards generated successfully!');
 
+            // Pull the newly stored cards into the local cache for next visit
+            syncFlashcards().catch(error => console.error('Cache sync error:', error));
+
         } catch (error) {
             console.error('Fetch Error:', error);
             showNotification(`Error: ${error.message}. Showing demo cards.`, 'error');
@@ -108,6 +119,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function handleClear() {
+        showSavedFlashcards = false;
         flashcardsContainer.innerHTML = '';
         notesInput.value = '';
         showNotification('All flashcards cleared.');
@@ -146,7 +158,130 @@ document.addEventListener('DOMContentLoaded', function() {
         generateBtn.disabled = isLoading;
     }
 
+    // --- Offline Flashcard Cache ---
+    // Saved cards live in IndexedDB so the dashboard can render immediately
+    // and only ask the server for what changed since the last visit.
+    const CACHE_DB_VERSION = 1;
+
+    function openCardCache() {
+        const userData = JSON.parse(localStorage.getItem('userData') || '{}');
+        if (!window.indexedDB || !userData.id) {
+            return Promise.resolve(null);
+        }
+
+        return new Promise((resolve, reject) => {
+            const request = indexedDB.open(`brainflip-cache-${userData.id}`, CACHE_DB_VERSION);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                db.createObjectStore('flashcards', { keyPath: 'id' });
+                db.createObjectStore('meta');
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+    function readCache(db) {
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(['flashcards', 'meta'], 'readonly');
+            const cardsRequest = tx.objectStore('flashcards').getAll();
+            const cursorRequest = tx.objectStore('meta').get('cursor');
+            tx.oncomplete = () => resolve({
+                cards: cardsRequest.result || [],
+                cursor: cursorRequest.result
+            });
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    function writeCache(db, { upserts = [], deletes = [], cursor, replace = false }) {
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(['flashcards', 'meta'], 'readwrite');
+            const cards = tx.objectStore('flashcards');
+            if (replace) {
+                cards.clear();
+            }
+            upserts.forEach(card => cards.put(card));
+            deletes.forEach(id => cards.delete(id));
+            tx.objectStore('meta').put(cursor, 'cursor');
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    async function fetchWithAuth(url) {
+        const response = await fetch(url, {
+            headers: { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` }
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || 'An unknown error occurred.');
+        }
+        return data;
+    }
+
+    // Bring the cache up to date. Returns true if anything changed.
+    async function syncFlashcards() {
+        const db = await openCardCache();
+        if (!db) {
+            return false;
+        }
+
+        const { cursor } = await readCache(db);
+        if (cursor === undefined) {
+            // First visit on this device: take a full snapshot
+            const data = await fetchWithAuth(`${API_BASE}/flashcards`);
+            await writeCache(db, { upserts: data.flashcards, cursor: data.cursor, replace: true });
+            return true;
+        }
+
+        let since = cursor;
+        let changed = false;
+        let hasMore = true;
+        while (hasMore) {
+            const data = await fetchWithAuth(`${API_BASE}/flashcards/changes?since=${since}`);
+            if (data.upserts.length || data.deletes.length) {
+                await writeCache(db, data);
+                changed = true;
+            }
+            since = data.cursor;
+            hasMore = data.has_more;
+        }
+        return changed;
+    }
+
+    function renderCachedFlashcards(cards) {
+        flashcardsContainer.innerHTML = '';
+        // Newest first, matching GET /flashcards
+        cards.sort((a, b) => b.id - a.id)
+            .forEach(card => createFlashcard(card.question, card.answer));
+    }
+
+    async function loadSavedFlashcards() {
+        try {
+            const db = await openCardCache();
+            if (!db) {
+                return;
+            }
+
+            const cached = await readCache(db);
+            if (cached.cards.length && showSavedFlashcards) {
+                renderCachedFlashcards(cached.cards);
+            }
+
+            // The cache is still brought up to date even if it isn't shown
+            const changed = await syncFlashcards();
+            if (changed && showSavedFlashcards) {
+                renderCachedFlashcards((await readCache(db)).cards);
+            }
+        } catch (error) {
+            // Whatever is already on screen stays usable offline
+            console.error('Flashcard cache error:', error);
+        }
+    }
+
     // --- Initial State ---
+    loadSavedFlashcards();
     notesInput.value = "The French Revolution was a period of radical political and societal change in France. It began with the Estates General of 1789 and ended in November 1799. Its ideas are fundamental principles of liberal democracy.";
 });
 
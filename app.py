@@ -8,6 +8,10 @@ import bcrypt
 import re
 import jwt
 import datetime
+import math
+import threading
+import time
+import uuid
 from functools import wraps
 from dotenv import load_dotenv
 
@@ -58,11 +62,36 @@ if not HF_TOKEN:
 # Using a more reliable model
 HF_API_URL = "https://api-inference.huggingface.co/models/google/flan-t5-base"
 HF_HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {}
+HF_TIMEOUT = 15  # seconds, applied to connect and read separately
+MAX_SENTENCES_PER_JOB = 10
 
 # Early adopter and premium tier constants
 EARLY_ADOPTER_LIMIT = 5
 PREMIUM_TIER = 'premium'
 
+# Maximum change-log rows returned by one /flashcards/changes call
+SYNC_PAGE_SIZE = 500
+
+# Generation admission control: (burst capacity, tokens refilled per second).
+# Per-user buckets stop one account monopolising workers; per-tier buckets
+# cap what a whole tier can push at the upstream model.
+GENERATION_USER_LIMITS = {
+    'early_adopter': (3, 1 / 60),
+    PREMIUM_TIER: (10, 1 / 10),
+}
+GENERATION_TIER_LIMITS = {
+    'early_adopter': (20, 1 / 5),
+    PREMIUM_TIER: (60, 1),
+}
+MAX_INFLIGHT_GENERATIONS = int(os.getenv('MAX_INFLIGHT_GENERATIONS', 8))
+# Seconds before a shared slot from a dead worker expires. Sized from the
+# slowest job the sync route can run: every sentence hitting both the
+# connect and read timeout in turn, plus time to store the results.
+INFLIGHT_SLOT_TTL = MAX_SENTENCES_PER_JOB * 2 * HF_TIMEOUT + 30
+UPSTREAM_BACKOFF_DEFAULT = 20  # seconds to shed load when HF reports it is busy
+UPSTREAM_BACKOFF_MAX = 120  # cap on an estimated_time taken from HF
+BUCKET_SWEEP_INTERVAL = 60  # seconds between drops of refilled local buckets
+
 # IntaSend Configuration
 try:
     from intasend import APIService
@@ -166,29 +195,57 @@ def split_into_sentences(text):
     sentences = re.split(r'(?<=[.!?])\s+', text)
     return [s for s in sentences if s and len(s.split()) > 3]
 
+def record_upstream_busy(response):
+    """Start shedding generation load after HF reports it is loading or overloaded"""
+    try:
+        backoff = float(response.json().get('estimated_time', UPSTREAM_BACKOFF_DEFAULT))
+    except (ValueError, TypeError, AttributeError):
+        backoff = UPSTREAM_BACKOFF_DEFAULT
+    # Also rejects NaN, so one odd response body can't shed load for hours
+    if not 0 < backoff:
+        backoff = UPSTREAM_BACKOFF_DEFAULT
+    admission_backend.set_upstream_backoff(min(backoff, UPSTREAM_BACKOFF_MAX))
+
+def question_prompt(context):
+    return {"inputs": f"Generate a question about: {context}"}
+
+def parse_generated_text(result):
+    """Pull the generated question out of a Hugging Face response body"""
+    if result and isinstance(result, list) and 'generated_text' in result[0]:
+        return result[0]['generated_text']
+    elif isinstance(result, dict) and 'generated_text' in result:
+        return result['generated_text']
+    return None
+
 def generate_question(context):
     try:
         if not HF_TOKEN:
             raise Exception("Hugging Face token not configured")
+        
+        # Don't queue more work on a model that has told us it is busy
+        if admission_backend.upstream_backoff_remaining() > 0:
+            raise Exception("Hugging Face API is backing off")
             
         response = requests.post(
             HF_API_URL,
             headers=HF_HEADERS, 
-            json={"inputs": f"Generate a question about: {context}"}, 
-            timeout=15
+            json=question_prompt(context), 
+            timeout=HF_TIMEOUT
         )
+        if response.status_code in (429, 503):
+            record_upstream_busy(response)
         response.raise_for_status()
-        result = response.json()
-        
-        if result and isinstance(result, list) and 'generated_text' in result[0]:
-            return result[0]['generated_text']
-        elif isinstance(result, dict) and 'generated_text' in result:
-            return result['generated_text']
+        question = parse_generated_text(response.json())
+        if question:
+            return question
             
     except Exception as e:
         print(f"Hugging Face API error: {e}")
     
-    # Fallback
+    return fallback_question(context)
+
+def fallback_question(context):
+    """Fill-in-the-blank question used when the AI service is unavailable"""
     words = context.split()
     if len(words) > 3:
         blank_index = len(words) // 2
@@ -196,6 +253,83 @@ def generate_question(context):
         return " ".join(words)
     return f"What is {context}?"
 
+# Taken at the start of every transaction that writes a user's change log.
+# Holding the user's row lock until commit means a user's log ids are
+# allocated and committed in the same order, so once a client has seen a
+# cursor no lower id for that user can appear afterwards.
+FLASHCARD_LOG_LOCK_QUERY = "SELECT id FROM users WHERE id = %s FOR UPDATE"
+
+# Flashcard and change-log SQL, shared with asgi.py so both serving modes
+# write and read the sync log identically
+INSERT_FLASHCARD_QUERY = "INSERT INTO flashcards (user_id, question, answer) VALUES (%s, %s, %s)"
+RECORD_FLASHCARD_CHANGE_QUERY = "INSERT INTO flashcard_changes (user_id, flashcard_id, op) VALUES (%s, %s, %s)"
+SYNC_CURSOR_QUERY = "SELECT COALESCE(MAX(id), 0) AS cursor_id FROM flashcard_changes WHERE user_id = %s"
+USER_FLASHCARDS_QUERY = "SELECT id, question, answer FROM flashcards WHERE user_id = %s ORDER BY created_at DESC"
+
+def lock_flashcard_log(cursor, user_id):
+    """Serialize change-log writers for one user until the transaction ends"""
+    cursor.execute(FLASHCARD_LOG_LOCK_QUERY, (user_id,))
+    cursor.fetchall()
+
+def record_flashcard_change(cursor, user_id, flashcard_id, op):
+    """Append a row to the change log that backs /flashcards/changes.
+
+    Must run on the same cursor (and transaction) as the write it describes,
+    after lock_flashcard_log, so the log never gets ahead of or behind the
+    flashcards table and its ids stay monotonic in commit order.
+    """
+    cursor.execute(RECORD_FLASHCARD_CHANGE_QUERY, (user_id, flashcard_id, op))
+
+def get_sync_cursor(cursor, user_id):
+    """Latest change-log id for a user, or 0 if nothing has changed yet"""
+    cursor.execute(SYNC_CURSOR_QUERY, (user_id,))
+    row = cursor.fetchone()
+    return row['cursor_id'] if isinstance(row, dict) else row[0]
+
+FLASHCARD_CHANGES_QUERY = """
+    SELECT c.id AS change_id, c.flashcard_id, c.op, f.question, f.answer
+    FROM flashcard_changes c
+    LEFT JOIN flashcards f ON f.id = c.flashcard_id
+    WHERE c.user_id = %s AND c.id > %s
+    ORDER BY c.id
+    LIMIT %s
+"""
+
+def parse_sync_cursor(value):
+    """Parse a ?since= cursor; returns None unless it is a plain ASCII integer"""
+    if not (value.isascii() and value.isdecimal()):
+        return None
+    return int(value)
+
+def collapse_flashcard_changes(changes, since, has_more):
+    """Turn change-log rows into the /flashcards/changes response body.
+
+    Only the latest state per card is kept; a card that no longer exists is
+    reported as deleted whatever the logged op was.
+    """
+    latest = {}
+    for change in changes:
+        latest[change['flashcard_id']] = change
+    
+    upserts = []
+    deletes = []
+    for card_id, change in latest.items():
+        if change['op'] == 'delete' or change['question'] is None:
+            deletes.append(card_id)
+        else:
+            upserts.append({
+                'id': card_id,
+                'question': change['question'],
+                'answer': change['answer']
+            })
+    
+    return {
+        'upserts': upserts,
+        'deletes': deletes,
+        'cursor': changes[-1]['change_id'] if changes else since,
+        'has_more': has_more
+    }
+
 def store_flashcards(flashcards, user_id):
     if not flashcards:
         return
@@ -204,12 +338,11 @@ def store_flashcards(flashcards, user_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        lock_flashcard_log(cursor, user_id)
         
         for card in flashcards:
-            cursor.execute(
-                "INSERT INTO flashcards (user_id, question, answer) VALUES (%s, %s, %s)",
-                (user_id, card['question'], card['answer'])
-            )
+            cursor.execute(INSERT_FLASHCARD_QUERY, (user_id, card['question'], card['answer']))
+            record_flashcard_change(cursor, user_id, cursor.lastrowid, 'upsert')
         
         conn.commit()
         print(f"Stored {len(flashcards)} flashcards for user {user_id}")
@@ -223,6 +356,9 @@ def store_flashcards(flashcards, user_id):
             cursor.close()
             conn.close()
 
+# User row loaded for authenticated requests, shared with asgi.py
+CURRENT_USER_QUERY = "SELECT id, username, email, is_premium, tier FROM users WHERE id = %s"
+
 # JWT Token Decorator
 def token_required(f):
     @wraps(f)
@@ -240,7 +376,7 @@ def token_required(f):
             
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT id, username, email, is_premium FROM users WHERE id = %s", (data['user_id'],))
+            cursor.execute(CURRENT_USER_QUERY, (data['user_id'],))
             current_user = cursor.fetchone()
             cursor.close()
             conn.close()
@@ -259,6 +395,255 @@ def token_required(f):
         
     return decorated
 
+# --- ADMISSION CONTROL ---
+class LocalAdmissionBackend:
+    """Token buckets, in-flight slots and upstream backoff for a single process"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (tokens, last update, capacity, refill rate); a missing key
+        # is a full bucket
+        self._buckets = {}
+        self._last_sweep = time.monotonic()
+        self._slots = set()
+        self._backoff_until = 0
+    
+    def _sweep_buckets(self, now):
+        """Drop buckets that have refilled, like the EXPIRE on Redis buckets"""
+        if now - self._last_sweep < BUCKET_SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        for key, (tokens, last, capacity, refill_rate) in list(self._buckets.items()):
+            if tokens + (now - last) * refill_rate >= capacity:
+                del self._buckets[key]
+    
+    def take_token(self, key, capacity, refill_rate):
+        """Take one token; returns 0 if admitted, else seconds until one is free"""
+        with self._lock:
+            now = time.monotonic()
+            self._sweep_buckets(now)
+            tokens, last, _, _ = self._buckets.get(key, (capacity, now, capacity, refill_rate))
+            tokens = min(capacity, tokens + (now - last) * refill_rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now, capacity, refill_rate)
+                return 0
+            self._buckets[key] = (tokens, now, capacity, refill_rate)
+            return (1 - tokens) / refill_rate
+    
+    def refund_token(self, key, capacity):
+        """Give back a token taken for a request that was rejected later on"""
+        with self._lock:
+            if key in self._buckets:
+                tokens, last, _, refill_rate = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + 1), last, capacity, refill_rate)
+    
+    def acquire_slot(self, limit):
+        """Returns a slot id to pass to release_slot, or None if all are taken"""
+        with self._lock:
+            if len(self._slots) >= limit:
+                return None
+            slot_id = uuid.uuid4().hex
+            self._slots.add(slot_id)
+            return slot_id
+    
+    def release_slot(self, slot_id):
+        if slot_id is None:
+            return
+        with self._lock:
+            self._slots.discard(slot_id)
+    
+    def set_upstream_backoff(self, seconds):
+        with self._lock:
+            self._backoff_until = max(self._backoff_until, time.monotonic() + seconds)
+    
+    def upstream_backoff_remaining(self):
+        return max(0, self._backoff_until - time.monotonic())
+
+class RedisAdmissionBackend:
+    """Same interface as LocalAdmissionBackend, shared across workers via Redis.
+
+    If Redis becomes unreachable each call falls back to a per-process
+    LocalAdmissionBackend, so generation keeps working with local limits
+    instead of failing outright.
+    """
+    
+    TAKE_TOKEN_SCRIPT = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+        local wait = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            wait = (1 - tokens) / rate
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+        return tostring(wait)
+    """
+    REFUND_TOKEN_SCRIPT = """
+        local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+        if tokens then
+            redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+        end
+    """
+    # Slots are members of a sorted set scored by their own deadline, so a
+    # slot leaked by a dead worker expires on schedule however busy we are.
+    ACQUIRE_SLOT_SCRIPT = """
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+        if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+            return 0
+        end
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+        redis.call('EXPIRE', KEYS[1], ARGV[5])
+        return 1
+    """
+    
+    def __init__(self, client, error_class, prefix='brainflip:admission:'):
+        self.client = client
+        self.error_class = error_class
+        self.prefix = prefix
+        self.fallback = LocalAdmissionBackend()
+        self._take_token = client.register_script(self.TAKE_TOKEN_SCRIPT)
+        self._refund_token = client.register_script(self.REFUND_TOKEN_SCRIPT)
+        self._acquire_slot = client.register_script(self.ACQUIRE_SLOT_SCRIPT)
+    
+    def _warn(self, e):
+        print(f"Admission Redis error: {e}. Falling back to per-process limits.")
+    
+    def take_token(self, key, capacity, refill_rate):
+        try:
+            wait = self._take_token(
+                keys=[self.prefix + 'bucket:' + key],
+                args=[capacity, refill_rate, time.time()]
+            )
+            return float(wait)
+        except self.error_class as e:
+            self._warn(e)
+            return self.fallback.take_token(key, capacity, refill_rate)
+    
+    def refund_token(self, key, capacity):
+        try:
+            self._refund_token(keys=[self.prefix + 'bucket:' + key], args=[capacity])
+        except self.error_class as e:
+            self._warn(e)
+        self.fallback.refund_token(key, capacity)
+    
+    def acquire_slot(self, limit):
+        slot_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            acquired = self._acquire_slot(
+                keys=[self.prefix + 'inflight'],
+                args=[limit, now, now + INFLIGHT_SLOT_TTL, slot_id, INFLIGHT_SLOT_TTL]
+            )
+            return slot_id if acquired == 1 else None
+        except self.error_class as e:
+            self._warn(e)
+            return self.fallback.acquire_slot(limit)
+    
+    def release_slot(self, slot_id):
+        if slot_id is None:
+            return
+        # The slot may have come from either store; releasing a slot id a
+        # store doesn't hold is a no-op.
+        self.fallback.release_slot(slot_id)
+        try:
+            self.client.zrem(self.prefix + 'inflight', slot_id)
+        except self.error_class as e:
+            self._warn(e)
+    
+    def set_upstream_backoff(self, seconds):
+        self.fallback.set_upstream_backoff(seconds)
+        key = self.prefix + 'upstream-backoff'
+        try:
+            if self.client.pttl(key) < seconds * 1000:
+                self.client.set(key, 1, px=int(seconds * 1000))
+        except self.error_class as e:
+            self._warn(e)
+    
+    def upstream_backoff_remaining(self):
+        try:
+            shared = max(0, self.client.pttl(self.prefix + 'upstream-backoff')) / 1000
+        except self.error_class as e:
+            self._warn(e)
+            shared = 0
+        return max(shared, self.fallback.upstream_backoff_remaining())
+
+def create_admission_backend():
+    """Use Redis when ADMISSION_REDIS_URL is set, otherwise per-process state"""
+    redis_url = os.getenv('ADMISSION_REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            print("Admission control using shared Redis backend!")
+            return RedisAdmissionBackend(client, redis.RedisError)
+        except ImportError:
+            print("Warning: redis package not installed. Admission control is per-process.")
+        except Exception as e:
+            print(f"Error connecting to admission Redis: {e}. Admission control is per-process.")
+    return LocalAdmissionBackend()
+
+admission_backend = create_admission_backend()
+
+def shed_details(message, retry_after):
+    """JSON body and headers for a shed request, shared with asgi.py"""
+    retry_after = max(1, math.ceil(retry_after))
+    return {'error': message, 'retryAfter': retry_after}, {'Retry-After': str(retry_after)}
+
+def shed_response(message, status, retry_after):
+    body, headers = shed_details(message, retry_after)
+    return jsonify(body), status, headers
+
+def admit_generation(user):
+    """Try to admit a generation job for a user.
+
+    Call only once the request has passed validation. Returns a
+    (slot_id, rejection) pair: the slot id must be passed to
+    admission_backend.release_slot when the job ends (it is None for tiers
+    without generation limits), and rejection is a (message, status,
+    retry_after) tuple when the job was turned away.
+    """
+    busy = 'Flashcard generation is busy. Please try again shortly.'
+    tier = user['tier']
+    if tier not in GENERATION_USER_LIMITS:
+        return None, None
+    
+    backoff = admission_backend.upstream_backoff_remaining()
+    if backoff > 0:
+        return None, (busy, 503, backoff)
+    
+    # Check the user bucket first so a throttled user never drains the
+    # bucket shared by the rest of their tier.
+    user_key = f"user:{user['id']}"
+    user_capacity, user_rate = GENERATION_USER_LIMITS[tier]
+    wait = admission_backend.take_token(user_key, user_capacity, user_rate)
+    if wait > 0:
+        return None, ('Too many generation requests. Please slow down.', 429, wait)
+    
+    # From here on a rejection is about capacity, not the user's own rate,
+    # so give back what they were charged.
+    tier_key = f"tier:{tier}"
+    tier_capacity, tier_rate = GENERATION_TIER_LIMITS[tier]
+    wait = admission_backend.take_token(tier_key, tier_capacity, tier_rate)
+    if wait > 0:
+        admission_backend.refund_token(user_key, user_capacity)
+        return None, (busy, 503, wait)
+    
+    slot_id = admission_backend.acquire_slot(MAX_INFLIGHT_GENERATIONS)
+    if slot_id is None:
+        admission_backend.refund_token(user_key, user_capacity)
+        admission_backend.refund_token(tier_key, tier_capacity)
+        return None, (busy, 503, 5)
+    
+    return slot_id, None
+
 # Initialize Database
 def initialize_database():
     conn = None
@@ -291,6 +676,21 @@ def initialize_database():
             )
         """)
         
+        # Create flashcard change log table. The AUTO_INCREMENT id is the
+        # monotonic sync cursor; flashcard_id deliberately has no foreign key
+        # so delete entries outlive the row they describe.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS flashcard_changes (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                flashcard_id INT NOT NULL,
+                op ENUM('upsert', 'delete') NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_flashcard_changes_user_cursor (user_id, id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+        
         # Create payments table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS payments (
@@ -662,24 +1062,34 @@ def generate_flashcards_route():
             }), 402
         
         cleaned_notes = clean_text(notes)
-        sentences = split_into_sentences(cleaned_notes)
+        sentences = split_into_sentences(cleaned_notes)[:MAX_SENTENCES_PER_JOB]
+        if not sentences:
+            return jsonify({'error': 'Could not generate flashcards from the provided text.'}), 400
         
-        flashcards = []
-        for sentence in sentences[:10]:
-            question = generate_question(sentence)
-            if question:
-                flashcards.append({'question': question, 'answer': sentence})
+        # Only requests that will actually reach the model spend tokens
+        slot_id, rejection = admit_generation(request.current_user)
+        if rejection:
+            return shed_response(*rejection)
         
-        if not flashcards:
-            return jsonify({'error': 'Could not generate flashcards from the provided text.'}), 400
+        try:
+            flashcards = []
+            for sentence in sentences:
+                question = generate_question(sentence)
+                if question:
+                    flashcards.append({'question': question, 'answer': sentence})
             
-        # Store in the database
-        store_flashcards(flashcards, request.current_user['id'])
-        
-        return jsonify({
-            'flashcards': flashcards,
-            'tier': request.current_user['tier']
-        })
+            if not flashcards:
+                return jsonify({'error': 'Could not generate flashcards from the provided text.'}), 400
+                
+            # Store in the database
+            store_flashcards(flashcards, request.current_user['id'])
+            
+            return jsonify({
+                'flashcards': flashcards,
+                'tier': request.current_user['tier']
+            })
+        finally:
+            admission_backend.release_slot(slot_id)
         
     except Exception as e:
         print(f"Flashcard generation error: {e}")
@@ -694,13 +1104,44 @@ def get_flashcards():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
+        # Read the cursor first: anything written after this point will be
+        # picked up by the client's next /flashcards/changes call.
+        sync_cursor = get_sync_cursor(cursor, request.current_user['id'])
+        cursor.execute(USER_FLASHCARDS_QUERY, (request.current_user['id'],))
+        flashcards = cursor.fetchall()
+        
+        return jsonify({'flashcards': flashcards, 'cursor': sync_cursor})
+        
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+@app.route('/flashcards/changes', methods=['GET'])
+@token_required
+def get_flashcard_changes():
+    """Get flashcards inserted, updated or deleted since a sync cursor"""
+    since = parse_sync_cursor(request.args.get('since', '0'))
+    if since is None:
+        return jsonify({'error': 'since must be a non-negative integer cursor'}), 400
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        # Fetch one extra row to know whether the client needs another page
         cursor.execute(
-            "SELECT question, answer FROM flashcards WHERE user_id = %s ORDER BY created_at DESC",
-            (request.current_user['id'],)
+            FLASHCARD_CHANGES_QUERY,
+            (request.current_user['id'], since, SYNC_PAGE_SIZE + 1)
         )
-        flashcards = cursor.fetchall()
+        changes = cursor.fetchall()
+        has_more = len(changes) > SYNC_PAGE_SIZE
+        changes = changes[:SYNC_PAGE_SIZE]
         
-        return jsonify({'flashcards': flashcards})
+        return jsonify(collapse_flashcard_changes(changes, since, has_more))
         
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
@@ -709,6 +1150,38 @@ def get_flashcards():
             cursor.close()
             conn.close()
 
+@app.route('/flashcards/<int:card_id>', methods=['DELETE'])
+@token_required
+def delete_flashcard(card_id):
+    """Delete one of the current user's flashcards"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        lock_flashcard_log(cursor, request.current_user['id'])
+        
+        cursor.execute(
+            "DELETE FROM flashcards WHERE id = %s AND user_id = %s",
+            (card_id, request.current_user['id'])
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return jsonify({'error': 'Flashcard not found'}), 404
+        
+        record_flashcard_change(cursor, request.current_user['id'], card_id, 'delete')
+        conn.commit()
+        
+        return jsonify({'success': True})
+        
+    except mysql.connector.Error as e:
+        if conn:
+            conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
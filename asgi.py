@@ -0,0 +1,328 @@
+"""Async serving mode for BrainFlip.
+
+The I/O-bound routes (flashcard generation, flashcard reads and payment
+verification) are served as async views with their own aiomysql pool and a
+shared httpx client, so a request waiting on MySQL, Hugging Face or IntaSend
+no longer pins a thread. Every other route falls through to the existing
+Flask app unchanged.
+
+Run with: uvicorn asgi:application --workers 4
+"""
+import asyncio
+import datetime
+import os
+from contextlib import asynccontextmanager
+from functools import wraps
+
+import aiomysql
+import httpx
+import jwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import (
+    CURRENT_USER_QUERY, FLASHCARD_CHANGES_QUERY, FLASHCARD_LOG_LOCK_QUERY,
+    HF_API_URL, HF_HEADERS, HF_TIMEOUT, HF_TOKEN, INSERT_FLASHCARD_QUERY,
+    JWT_ALGORITHM, JWT_SECRET, MAX_INFLIGHT_GENERATIONS, MAX_SENTENCES_PER_JOB,
+    PREMIUM_TIER, RECORD_FLASHCARD_CHANGE_QUERY, SYNC_CURSOR_QUERY,
+    SYNC_PAGE_SIZE, USER_FLASHCARDS_QUERY, admission_backend, admit_generation,
+    app as flask_app, clean_text, collapse_flashcard_changes, db_config,
+    fallback_question, intasend_service, parse_generated_text,
+    parse_sync_cursor, question_prompt, record_upstream_busy, shed_details,
+    split_into_sentences,
+)
+
+ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+# Upper bound on concurrent Hugging Face calls per worker. The default keeps
+# upstream load at what the sync route produces with one call per job.
+HF_MAX_CONCURRENCY = int(os.getenv('HF_MAX_CONCURRENCY', MAX_INFLIGHT_GENERATIONS))
+
+@asynccontextmanager
+async def lifespan(application):
+    application.state.db_pool = await aiomysql.create_pool(
+        host=db_config['host'],
+        user=db_config['user'],
+        password=db_config['password'],
+        db=db_config['database'],
+        minsize=1,
+        maxsize=ASYNC_DB_POOL_SIZE,
+        # Pooled connections must not carry a stale REPEATABLE READ snapshot
+        # between requests; writes open their own transaction with begin()
+        autocommit=True
+    )
+    application.state.http = httpx.AsyncClient(
+        timeout=HF_TIMEOUT,
+        limits=httpx.Limits(max_connections=HF_MAX_CONCURRENCY)
+    )
+    # Created here rather than at import so it belongs to the server's loop
+    application.state.hf_semaphore = asyncio.Semaphore(HF_MAX_CONCURRENCY)
+    print("Async database pool and HTTP client created successfully!")
+    try:
+        yield
+    finally:
+        await application.state.http.aclose()
+        application.state.db_pool.close()
+        await application.state.db_pool.wait_closed()
+
+# JWT Token Decorator
+def async_token_required(f):
+    @wraps(f)
+    async def decorated(request):
+        token = request.headers.get('Authorization')
+
+        if not token:
+            return JSONResponse({'error': 'Token is missing'}, 401)
+
+        try:
+            if token.startswith('Bearer '):
+                token = token[7:]
+
+            data = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            return JSONResponse({'error': 'Token has expired'}, 401)
+        except jwt.InvalidTokenError:
+            return JSONResponse({'error': 'Token is invalid'}, 401)
+
+        async with request.app.state.db_pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(CURRENT_USER_QUERY, (data['user_id'],))
+                current_user = await cursor.fetchone()
+
+        if not current_user:
+            return JSONResponse({'error': 'User not found'}, 401)
+
+        request.state.current_user = current_user
+        return await f(request)
+
+    return decorated
+
+async def generate_question(state, context, upstream_busy):
+    """Async generate_question; upstream_busy is shared by one job's calls.
+
+    The shared backoff is checked once per job by admit_generation, so only
+    the job-local event is consulted here and no admission call runs on the
+    event loop.
+    """
+    try:
+        if not HF_TOKEN:
+            raise Exception("Hugging Face token not configured")
+
+        async with state.hf_semaphore:
+            # A sibling call was told the model is busy; don't add to it
+            if upstream_busy.is_set():
+                raise Exception("Hugging Face API is backing off")
+
+            response = await state.http.post(HF_API_URL, headers=HF_HEADERS, json=question_prompt(context))
+            if response.status_code in (429, 503):
+                upstream_busy.set()
+
+        if response.status_code in (429, 503):
+            await run_in_threadpool(record_upstream_busy, response)
+        response.raise_for_status()
+        question = parse_generated_text(response.json())
+        if question:
+            return question
+
+    except Exception as e:
+        print(f"Hugging Face API error: {e}")
+
+    return fallback_question(context)
+
+async def store_flashcards(pool, flashcards, user_id):
+    if not flashcards:
+        return
+
+    async with pool.acquire() as conn:
+        try:
+            await conn.begin()
+            async with conn.cursor() as cursor:
+                await cursor.execute(FLASHCARD_LOG_LOCK_QUERY, (user_id,))
+                await cursor.fetchall()
+                for card in flashcards:
+                    await cursor.execute(
+                        INSERT_FLASHCARD_QUERY, (user_id, card['question'], card['answer'])
+                    )
+                    await cursor.execute(
+                        RECORD_FLASHCARD_CHANGE_QUERY, (user_id, cursor.lastrowid, 'upsert')
+                    )
+            await conn.commit()
+            print(f"Stored {len(flashcards)} flashcards for user {user_id}")
+
+        except aiomysql.Error as e:
+            print(f"Database error: {e}")
+            await conn.rollback()
+
+# Flashcard endpoints
+@async_token_required
+async def generate_flashcards_route(request):
+    current_user = request.state.current_user
+
+    try:
+        data = await request.json()
+        notes = data.get('notes', '')
+
+        if not notes:
+            return JSONResponse({'error': 'No notes provided'}, 400)
+
+        # Check if user has access
+        if current_user['tier'] == 'free':
+            return JSONResponse({
+                'error': 'Premium feature. Upgrade to access AI flashcard generation.',
+                'requiresPayment': True
+            }, 402)
+
+        cleaned_notes = clean_text(notes)
+        sentences = split_into_sentences(cleaned_notes)[:MAX_SENTENCES_PER_JOB]
+        if not sentences:
+            return JSONResponse({'error': 'Could not generate flashcards from the provided text.'}, 400)
+
+        # Admission state may live in Redis, so keep its calls off the event loop
+        slot_id, rejection = await run_in_threadpool(admit_generation, current_user)
+        if rejection:
+            message, status, retry_after = rejection
+            body, headers = shed_details(message, retry_after)
+            return JSONResponse(body, status, headers=headers)
+
+        try:
+            # Unlike the sync route, ask for the questions concurrently,
+            # bounded per worker by the shared HF semaphore
+            upstream_busy = asyncio.Event()
+            questions = await asyncio.gather(*(
+                generate_question(request.app.state, sentence, upstream_busy)
+                for sentence in sentences
+            ))
+            flashcards = [
+                {'question': question, 'answer': sentence}
+                for question, sentence in zip(questions, sentences)
+                if question
+            ]
+
+            if not flashcards:
+                return JSONResponse({'error': 'Could not generate flashcards from the provided text.'}, 400)
+
+            # Store in the database
+            await store_flashcards(request.app.state.db_pool, flashcards, current_user['id'])
+
+            return JSONResponse({
+                'flashcards': flashcards,
+                'tier': current_user['tier']
+            })
+        finally:
+            await run_in_threadpool(admission_backend.release_slot, slot_id)
+
+    except Exception as e:
+        print(f"Flashcard generation error: {e}")
+        return JSONResponse({'error': 'An internal server error occurred.'}, 500)
+
+@async_token_required
+async def get_flashcards(request):
+    """Get all flashcards for the current user"""
+    user_id = request.state.current_user['id']
+    try:
+        async with request.app.state.db_pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(SYNC_CURSOR_QUERY, (user_id,))
+                sync_cursor = (await cursor.fetchone())['cursor_id']
+                await cursor.execute(USER_FLASHCARDS_QUERY, (user_id,))
+                flashcards = await cursor.fetchall()
+
+        return JSONResponse({'flashcards': flashcards, 'cursor': sync_cursor})
+
+    except aiomysql.Error as e:
+        return JSONResponse({'error': str(e)}, 500)
+
+@async_token_required
+async def get_flashcard_changes(request):
+    """Get flashcards inserted, updated or deleted since a sync cursor"""
+    since = parse_sync_cursor(request.query_params.get('since', '0'))
+    if since is None:
+        return JSONResponse({'error': 'since must be a non-negative integer cursor'}, 400)
+
+    try:
+        async with request.app.state.db_pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(
+                    FLASHCARD_CHANGES_QUERY,
+                    (request.state.current_user['id'], since, SYNC_PAGE_SIZE + 1)
+                )
+                changes = await cursor.fetchall()
+
+        has_more = len(changes) > SYNC_PAGE_SIZE
+        return JSONResponse(collapse_flashcard_changes(changes[:SYNC_PAGE_SIZE], since, has_more))
+
+    except aiomysql.Error as e:
+        return JSONResponse({'error': str(e)}, 500)
+
+# Payment endpoints
+@async_token_required
+async def verify_payment(request):
+    current_user = request.state.current_user
+    try:
+        data = await request.json()
+        invoice_id = data.get('invoice_id', '')
+
+        if not invoice_id:
+            return JSONResponse({'error': 'Invoice ID is required'}, 400)
+
+        if not intasend_service:
+            return JSONResponse({'error': 'Payment service not configured'}, 503)
+
+        # The IntaSend SDK is blocking, so run it on the thread pool
+        status = await run_in_threadpool(intasend_service.status, invoice_id)
+
+        if status['invoice']['state'] != 'COMPLETE':
+            return JSONResponse({
+                'error': 'Payment not completed',
+                'status': status['invoice']['state']
+            }, 400)
+
+        async with request.app.state.db_pool.acquire() as conn:
+            await conn.begin()
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    "UPDATE payments SET status = 'COMPLETED' WHERE invoice_id = %s",
+                    (invoice_id,)
+                )
+
+                # Upgrade user to premium
+                await cursor.execute(
+                    "UPDATE users SET tier = %s WHERE id = %s",
+                    (PREMIUM_TIER, current_user['id'])
+                )
+            await conn.commit()
+
+        # Generate new token with updated user info
+        new_token = jwt.encode({
+            'user_id': current_user['id'],
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
+        }, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+        return JSONResponse({
+            'success': 'Payment verified and account upgraded to premium',
+            'token': new_token,
+            'tier': PREMIUM_TIER
+        })
+
+    except Exception as e:
+        print(f"Payment verification error: {e}")
+        return JSONResponse({'error': str(e)}, 500)
+
+# CORS preflights fall through to Flask-CORS; this covers the actual responses
+cors = [Middleware(CORSMiddleware, allow_origin_regex='.*', allow_credentials=True)]
+
+application = Starlette(
+    routes=[
+        Route('/generate-flashcards', generate_flashcards_route, methods=['POST'], middleware=cors),
+        Route('/flashcards', get_flashcards, methods=['GET'], middleware=cors),
+        Route('/flashcards/changes', get_flashcard_changes, methods=['GET'], middleware=cors),
+        Route('/verify-payment', verify_payment, methods=['POST'], middleware=cors),
+        # Auth, webhook and every other route stay on the sync Flask app
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
@@ -36,6 +36,16 @@ CREATE TABLE IF NOT EXISTS flashcards (
     FOREIGN KEY (deck_id) REFERENCES decks(id) ON DELETE CASCADE
 );
 
+-- Append-only log of flashcard writes; its id is the client sync cursor
+CREATE TABLE IF NOT EXISTS flashcard_changes (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    flashcard_id INT NOT NULL,
+    op ENUM('upsert', 'delete') NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
 -- Table to store payment information
 CREATE TABLE payments (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -52,6 +62,7 @@ CREATE TABLE payments (
 -- Add indexes for better query performance
 CREATE INDEX idx_decks_user_id ON decks(user_id);
 CREATE INDEX idx_flashcards_deck_id ON flashcards(deck_id);
+CREATE INDEX idx_flashcard_changes_user_cursor ON flashcard_changes(user_id, id);
 
 -- Insert default user and deck FIRST
 INSERT IGNORE INTO users (id, username, email, password_hash, is_premium) VALUES 